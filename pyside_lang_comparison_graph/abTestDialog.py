@@ -0,0 +1,104 @@
+from PySide6.QtCore import QSettings
+from PySide6.QtWidgets import QDialog, QFormLayout, QGroupBox, QHBoxLayout, QLineEdit, QPushButton, QSpinBox, \
+    QVBoxLayout, QWidget
+
+
+class ABTestDialog(QDialog):
+    def __init__(self):
+        super().__init__()
+        self.__initVal()
+        self.__initSettings()
+        self.__initUi()
+
+    def __initVal(self):
+        # command is executed in this directory with "times" as last argument,
+        # so anything which prints "<name>: <seconds> seconds" like a.* files can be compared
+        self.__ab_dict = {
+            'NameA': 'Rust',
+            'CommandA': 'cargo run --release --',
+            'NameB': 'Rust (LTO)',
+            'CommandB': 'env CARGO_PROFILE_RELEASE_LTO=true CARGO_TARGET_DIR=target-lto cargo run --release --',
+            'Rounds': 10
+        }
+
+    def __initSettings(self):
+        # [AB]
+        self.__settingsStruct = QSettings('settings.ini', QSettings.IniFormat)
+        self.__settingsStruct.beginGroup('AB')
+        for k, v in self.__ab_dict.items():
+            self.__ab_dict[k] = type(v)(self.__settingsStruct.value(k, v))
+        self.__settingsStruct.endGroup()
+
+    def __initUi(self):
+        self.setWindowTitle('A/B Test')
+
+        self.__nameALineEdit = QLineEdit(self.__ab_dict['NameA'])
+        self.__commandALineEdit = QLineEdit(self.__ab_dict['CommandA'])
+        self.__nameBLineEdit = QLineEdit(self.__ab_dict['NameB'])
+        self.__commandBLineEdit = QLineEdit(self.__ab_dict['CommandB'])
+        for lineEdit in [self.__nameALineEdit, self.__commandALineEdit, self.__nameBLineEdit, self.__commandBLineEdit]:
+            lineEdit.textChanged.connect(self.__textChanged)
+
+        self.__roundsSpinBox = QSpinBox()
+        self.__roundsSpinBox.setRange(2, 1000)
+        self.__roundsSpinBox.setValue(self.__ab_dict['Rounds'])
+
+        lay = QFormLayout()
+        lay.addRow('Name of A', self.__nameALineEdit)
+        lay.addRow('Command of A', self.__commandALineEdit)
+        lay.addRow('Name of B', self.__nameBLineEdit)
+        lay.addRow('Command of B', self.__commandBLineEdit)
+        lay.addRow('Rounds', self.__roundsSpinBox)
+
+        grpBox = QGroupBox()
+        grpBox.setTitle('Each round runs A and B once in random order')
+        grpBox.setLayout(lay)
+
+        self.__okBtn = QPushButton('Run A/B Test')
+        self.__okBtn.clicked.connect(self.accept)
+
+        closeBtn = QPushButton('Close')
+        closeBtn.clicked.connect(self.close)
+
+        lay = QHBoxLayout()
+        lay.addWidget(self.__okBtn)
+        lay.addWidget(closeBtn)
+        lay.setContentsMargins(0, 0, 0, 0)
+
+        bottomWidget = QWidget()
+        bottomWidget.setLayout(lay)
+
+        lay = QVBoxLayout()
+        lay.addWidget(grpBox)
+        lay.addWidget(bottomWidget)
+
+        self.setLayout(lay)
+        self.setMinimumWidth(600)
+        self.__textChanged()
+
+    # every field is needed and both of names should be different from each other
+    def __textChanged(self):
+        nameA = self.__nameALineEdit.text().strip()
+        nameB = self.__nameBLineEdit.text().strip()
+        f = bool(nameA and nameB and nameA != nameB
+                 and self.__commandALineEdit.text().strip() and self.__commandBLineEdit.text().strip())
+        self.__okBtn.setEnabled(f)
+
+    def getVariantDict(self):
+        return {
+            self.__nameALineEdit.text().strip(): self.__commandALineEdit.text().strip(),
+            self.__nameBLineEdit.text().strip(): self.__commandBLineEdit.text().strip()
+        }
+
+    def getRounds(self):
+        return self.__roundsSpinBox.value()
+
+    def accept(self) -> None:
+        super().accept()
+        self.__settingsStruct.beginGroup('AB')
+        self.__settingsStruct.setValue('NameA', self.__nameALineEdit.text().strip())
+        self.__settingsStruct.setValue('CommandA', self.__commandALineEdit.text().strip())
+        self.__settingsStruct.setValue('NameB', self.__nameBLineEdit.text().strip())
+        self.__settingsStruct.setValue('CommandB', self.__commandBLineEdit.text().strip())
+        self.__settingsStruct.setValue('Rounds', self.__roundsSpinBox.value())
+        self.__settingsStruct.endGroup()
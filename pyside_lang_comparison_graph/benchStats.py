@@ -0,0 +1,137 @@
+import math
+import random
+import re
+import statistics
+
+# every test script prints its result like "Go: 0.012345 seconds"
+RESULT_PATTERN = re.compile(r'([\w]+):\s([\d\\.]+)\sseconds')
+
+# two-sided 95% critical values of Student's t distribution (key is degrees of freedom)
+_T_975 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228,
+    11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093,
+    20: 2.086, 21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064, 25: 2.060, 26: 2.056, 27: 2.052, 28: 2.048,
+    29: 2.045, 30: 2.042, 40: 2.021, 60: 2.000, 120: 1.980
+}
+
+
+def parseResults(lines):
+    """ Get [language, seconds] pairs out of raw output lines of the test scripts """
+    lst = []
+    for line in lines:
+        for k, v in RESULT_PATTERN.findall(line):
+            lst.append([k, float(v)])
+    return lst
+
+
+def tCritical(df):
+    if df < 1:
+        return math.inf
+    if df in _T_975:
+        return _T_975[df]
+    # interpolate in 1/df between the neighbours in the table (1/df = 0 is the normal distribution, 1.960)
+    lo = max(k for k in _T_975.keys() if k < df)
+    hi = min([k for k in _T_975.keys() if k > df] + [math.inf])
+    t_lo, t_hi = _T_975[lo], _T_975.get(hi, 1.960)
+    frac = (1 / lo - 1 / df) / (1 / lo - 1 / hi)
+    return t_lo + (t_hi - t_lo) * frac
+
+
+def meanCi(samples):
+    """ Mean and half width of its 95% confidence interval """
+    mean = statistics.mean(samples)
+    if len(samples) < 2:
+        return mean, math.inf
+    half = tCritical(len(samples) - 1) * statistics.stdev(samples) / math.sqrt(len(samples))
+    return mean, half
+
+
+def relCi(samples):
+    """ Half width of 95% confidence interval relative to the mean (0.02 means ±2%) """
+    mean, half = meanCi(samples)
+    if mean == 0:
+        return 0.0 if half == 0 else math.inf
+    return half / mean
+
+
+def speedupCi(a, b, resamples=2000, seed=0):
+    """ Speedup of b over a (mean(a) / mean(b)) and its 95% percentile bootstrap interval """
+    speedup = statistics.mean(a) / statistics.mean(b)
+    # fixed seed, so the same samples always give the same interval
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(resamples):
+        mean_a = statistics.mean(rng.choices(a, k=len(a)))
+        mean_b = statistics.mean(rng.choices(b, k=len(b)))
+        if mean_b > 0:
+            ratios.append(mean_a / mean_b)
+    if not ratios:
+        return speedup, math.nan, math.nan
+    ratios.sort()
+    return speedup, ratios[int(0.025 * (len(ratios) - 1))], ratios[int(0.975 * (len(ratios) - 1))]
+
+
+def _ranks(values):
+    # average rank for tied values, rank starts from 1
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for idx in order[i:j + 1]:
+            ranks[idx] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def _exactUCdf(n1, n2):
+    # cnt[u] is the number of orderings of n1 + n2 distinct values whose U statistic is u
+    cnt = [[[1] for _ in range(n2 + 1)] for _ in range(n1 + 1)]
+    for i in range(1, n1 + 1):
+        for j in range(1, n2 + 1):
+            prev_i, prev_j = cnt[i - 1][j], cnt[i][j - 1]
+            cur = [0] * (i * j + 1)
+            # the largest value belongs to the first group, so it beats every value of the second one
+            for u, c in enumerate(prev_i):
+                cur[u + j] += c
+            for u, c in enumerate(prev_j):
+                cur[u] += c
+            cnt[i][j] = cur
+    total = math.comb(n1 + n2, n1)
+    cdf = []
+    acc = 0
+    for c in cnt[n1][n2]:
+        acc += c
+        cdf.append(acc / total)
+    return cdf
+
+
+def mannWhitneyU(a, b):
+    """ U statistic of a and two-sided p-value of the Mann-Whitney U test
+
+    Exact distribution is used for small samples without ties,
+    otherwise normal approximation with tie and continuity correction. """
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return math.nan, math.nan
+    values = list(a) + list(b)
+    ranks = _ranks(values)
+    u = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+    mu = n1 * n2 / 2
+
+    has_ties = len(set(values)) < len(values)
+    if not has_ties and n1 + n2 <= 30:
+        cdf = _exactUCdf(n1, n2)
+        # distribution of U is symmetric around mu
+        u_low = int(min(u, n1 * n2 - u))
+        return u, min(1.0, 2 * cdf[u_low])
+
+    n = n1 + n2
+    tie_sum = sum(t ** 3 - t for t in (values.count(v) for v in set(values)))
+    var = n1 * n2 / 12 * ((n + 1) - tie_sum / (n * (n - 1)))
+    if var <= 0:
+        return u, 1.0
+    z = max(0.0, abs(u - mu) - 0.5) / math.sqrt(var)
+    return u, math.erfc(z / math.sqrt(2))
@@ -0,0 +1,118 @@
+import shlex
+import sqlite3
+import time
+
+# every job and its result are saved here as soon as it is finished
+JOB_DB = 'jobs.db'
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class JobQueue:
+    """ Benchmark jobs (language, command, times, trial) persisted in sqlite
+
+    Each instance has its own connection, so make one for each thread. """
+
+    def __init__(self, path=JOB_DB):
+        self.__conn = sqlite3.connect(path, timeout=30)
+        self.__conn.row_factory = sqlite3.Row
+        with self.__conn:
+            self.__conn.execute('''CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                position INTEGER NOT NULL,
+                language TEXT NOT NULL,
+                command TEXT NOT NULL,
+                n TEXT NOT NULL,
+                trial INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                seconds REAL,
+                finished_at REAL
+            )''')
+
+    def close(self):
+        self.__conn.close()
+
+    def addJobs(self, command_dict: dict, ns: list, trials: int):
+        """ Add (language, command, n, trial) job for every combination, trials of the same point are interleaved
+        with other languages so drift of the machine doesn't affect only one of them """
+        position = self.__conn.execute('SELECT COALESCE(MAX(position), 0) FROM jobs').fetchone()[0]
+        rows = []
+        for n in ns:
+            for trial in range(1, trials + 1):
+                for language, command in command_dict.items():
+                    position += 1
+                    rows.append((position, language, shlex.join(command), str(n), trial, PENDING))
+        with self.__conn:
+            self.__conn.executemany('INSERT INTO jobs (position, language, command, n, trial, status) '
+                                    'VALUES (?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def jobs(self):
+        return self.__conn.execute('SELECT * FROM jobs ORDER BY position').fetchall()
+
+    def results(self):
+        return self.__conn.execute('SELECT * FROM jobs WHERE status = ? ORDER BY position', (DONE,)).fetchall()
+
+    def nextPending(self):
+        return self.__conn.execute('SELECT * FROM jobs WHERE status = ? ORDER BY position LIMIT 1',
+                                   (PENDING,)).fetchone()
+
+    def pendingCount(self):
+        return self.__conn.execute('SELECT COUNT(*) FROM jobs WHERE status = ?', (PENDING,)).fetchone()[0]
+
+    # job which was running when the app was closed or crashed has to be done again
+    def resetRunning(self):
+        self.__setStatus(RUNNING, PENDING)
+
+    def __setStatus(self, old, new):
+        with self.__conn:
+            self.__conn.execute('UPDATE jobs SET status = ? WHERE status = ?', (new, old))
+
+    def markRunning(self, job_id):
+        self.__update(job_id, RUNNING)
+
+    def markPending(self, job_id):
+        self.__update(job_id, PENDING)
+
+    def markDone(self, job_id, seconds):
+        self.__update(job_id, DONE, seconds)
+
+    def markFailed(self, job_id):
+        self.__update(job_id, FAILED)
+
+    def __update(self, job_id, status, seconds=None):
+        finished_at = time.time() if status in (DONE, FAILED) else None
+        with self.__conn:
+            self.__conn.execute('UPDATE jobs SET status = ?, seconds = ?, finished_at = ? WHERE id = ?',
+                                (status, seconds, finished_at, job_id))
+
+    def cancel(self, job_ids):
+        with self.__conn:
+            self.__conn.executemany('UPDATE jobs SET status = ? WHERE id = ? AND status = ?',
+                                    [(CANCELLED, job_id, PENDING) for job_id in job_ids])
+
+    def move(self, job_id, offset):
+        """ Swap the pending job with its pending neighbour (offset -1 is up, 1 is down) """
+        row = self.__conn.execute('SELECT position FROM jobs WHERE id = ? AND status = ?',
+                                  (job_id, PENDING)).fetchone()
+        if row is None:
+            return False
+        if offset < 0:
+            query = 'SELECT id, position FROM jobs WHERE status = ? AND position < ? ORDER BY position DESC LIMIT 1'
+        else:
+            query = 'SELECT id, position FROM jobs WHERE status = ? AND position > ? ORDER BY position LIMIT 1'
+        other = self.__conn.execute(query, (PENDING, row['position'])).fetchone()
+        if other is None:
+            return False
+        with self.__conn:
+            self.__conn.execute('UPDATE jobs SET position = ? WHERE id = ?', (other['position'], job_id))
+            self.__conn.execute('UPDATE jobs SET position = ? WHERE id = ?', (row['position'], other['id']))
+        return True
+
+    def clearFinished(self):
+        with self.__conn:
+            self.__conn.execute('DELETE FROM jobs WHERE status IN (?, ?, ?)', (DONE, FAILED, CANCELLED))
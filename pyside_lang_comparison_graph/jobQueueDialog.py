@@ -0,0 +1,169 @@
+import re
+
+from PySide6.QtCore import Qt, QItemSelectionModel
+from PySide6.QtWidgets import QDialog, QHBoxLayout, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, \
+    QAbstractItemView, QHeaderView, QGroupBox, QLineEdit, QSpinBox, QLabel, QWidget
+
+from jobQueue import JOB_DB, JobQueue, PENDING
+
+
+class JobQueueDialog(QDialog):
+    def __init__(self, command_dict: dict, running=False, job_db=JOB_DB):
+        super().__init__()
+        self.__initVal(command_dict, running, job_db)
+        self.__initUi()
+
+    def __initVal(self, command_dict, running, job_db):
+        # languages to add to the queue (language: command)
+        self.__command_dict = command_dict
+        # jobs can be reordered/cancelled while running, but can't be run twice
+        self.__running = running
+        self.__queue = JobQueue(job_db)
+        # job left running by a crash can be resumed (or cancelled/moved) only after it is back to pending
+        if not running:
+            self.__queue.resetRunning()
+
+    def __initUi(self):
+        self.setWindowTitle('Job Queue')
+
+        # times are separated by space (comma is for thousands)
+        self.__timesLineEdit = QLineEdit()
+        self.__timesLineEdit.setPlaceholderText('e.g. 1,000,000 10,000,000 100,000,000')
+        self.__timesLineEdit.textChanged.connect(self.__timesChanged)
+
+        self.__trialsSpinBox = QSpinBox()
+        self.__trialsSpinBox.setRange(1, 1000)
+        self.__trialsSpinBox.setValue(5)
+
+        self.__addBtn = QPushButton('Add')
+        self.__addBtn.clicked.connect(self.__add)
+        self.__addBtn.setEnabled(False)
+
+        lay = QHBoxLayout()
+        lay.addWidget(QLabel('Times'))
+        lay.addWidget(self.__timesLineEdit)
+        lay.addWidget(QLabel('Trials'))
+        lay.addWidget(self.__trialsSpinBox)
+        lay.addWidget(self.__addBtn)
+
+        sweepGrpBox = QGroupBox()
+        sweepGrpBox.setTitle(f'Add Sweep ({", ".join(self.__command_dict.keys()) or "No language selected"})')
+        sweepGrpBox.setLayout(lay)
+        sweepGrpBox.setEnabled(bool(self.__command_dict))
+
+        self.__tableWidget = QTableWidget()
+        self.__tableWidget.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.__tableWidget.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.__tableWidget.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.__tableWidget.setColumnCount(6)
+        self.__tableWidget.setHorizontalHeaderLabels(['Language', 'Command', 'Times', 'Trial', 'Status', 'Seconds'])
+        self.__tableWidget.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.__tableWidget.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.__tableWidget.verticalHeader().setHidden(True)
+
+        upBtn = QPushButton('Move Up')
+        upBtn.clicked.connect(lambda: self.__move(-1))
+        downBtn = QPushButton('Move Down')
+        downBtn.clicked.connect(lambda: self.__move(1))
+        cancelBtn = QPushButton('Cancel Jobs')
+        cancelBtn.clicked.connect(self.__cancel)
+        clearBtn = QPushButton('Clear Finished')
+        clearBtn.clicked.connect(self.__clearFinished)
+
+        lay = QHBoxLayout()
+        lay.addWidget(upBtn)
+        lay.addWidget(downBtn)
+        lay.addWidget(cancelBtn)
+        lay.addWidget(clearBtn)
+        lay.setContentsMargins(0, 0, 0, 0)
+
+        editWidget = QWidget()
+        editWidget.setLayout(lay)
+
+        self.__okBtn = QPushButton('Run')
+        self.__okBtn.clicked.connect(self.accept)
+
+        closeBtn = QPushButton('Close')
+        closeBtn.clicked.connect(self.close)
+
+        lay = QHBoxLayout()
+        lay.addWidget(self.__okBtn)
+        lay.addWidget(closeBtn)
+        lay.setContentsMargins(0, 0, 0, 0)
+
+        bottomWidget = QWidget()
+        bottomWidget.setLayout(lay)
+
+        lay = QVBoxLayout()
+        lay.addWidget(sweepGrpBox)
+        lay.addWidget(self.__tableWidget)
+        lay.addWidget(editWidget)
+        lay.addWidget(bottomWidget)
+
+        self.setLayout(lay)
+        self.resize(800, 500)
+        self.refresh()
+
+    def __getTimes(self):
+        return [int(t.replace(',', '')) for t in self.__timesLineEdit.text().split()]
+
+    def __timesChanged(self, text):
+        # check each of times on its own, pattern for the whole text would backtrack a lot on a long wrong input
+        times = text.split()
+        # times of 0 (only zeros and commas) are not allowed
+        self.__addBtn.setEnabled(bool(times) and all(re.fullmatch(r'\d[\d,]*', t) and t.strip('0,') for t in times))
+
+    def __add(self):
+        self.__queue.addJobs(self.__command_dict, self.__getTimes(), self.__trialsSpinBox.value())
+        self.refresh()
+
+    def __selectedJobIds(self):
+        rows = sorted(set(idx.row() for idx in self.__tableWidget.selectedIndexes()))
+        return [self.__tableWidget.item(r, 0).data(Qt.UserRole) for r in rows]
+
+    def __move(self, offset):
+        job_ids = self.__selectedJobIds()
+        # move the one next to the neighbour first, so selected jobs keep their order
+        if offset > 0:
+            job_ids.reverse()
+        for job_id in job_ids:
+            self.__queue.move(job_id, offset)
+        self.refresh()
+
+    def __cancel(self):
+        self.__queue.cancel(self.__selectedJobIds())
+        self.refresh()
+
+    def __clearFinished(self):
+        self.__queue.clearFinished()
+        self.refresh()
+
+    def __select(self, job_ids):
+        selectionModel = self.__tableWidget.selectionModel()
+        for r in range(self.__tableWidget.rowCount()):
+            if self.__tableWidget.item(r, 0).data(Qt.UserRole) in job_ids:
+                selectionModel.select(self.__tableWidget.model().index(r, 0),
+                                      QItemSelectionModel.Select | QItemSelectionModel.Rows)
+
+    # it is also called by the main window whenever a job is updated (with id of the job)
+    def refresh(self, *args):
+        # keep the selection, so user can go on reordering while the queue is running
+        selected_job_ids = self.__selectedJobIds()
+        jobs = self.__queue.jobs()
+        self.__tableWidget.clearSelection()
+        self.__tableWidget.setRowCount(len(jobs))
+        for i, job in enumerate(jobs):
+            seconds = '' if job['seconds'] is None else f"{job['seconds']:.6f}"
+            for j, text in enumerate([job['language'], job['command'], f"{int(job['n']):,}", str(job['trial']),
+                                      job['status'], seconds]):
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignCenter)
+                item.setData(Qt.UserRole, job['id'])
+                self.__tableWidget.setItem(i, j, item)
+        self.__select(selected_job_ids)
+        self.__okBtn.setEnabled(not self.__running and any(job['status'] == PENDING for job in jobs))
+        self.__okBtn.setText('Resume' if any(job['status'] != PENDING for job in jobs) else 'Run')
+
+    def done(self, r) -> None:
+        self.__queue.close()
+        super().done(r)
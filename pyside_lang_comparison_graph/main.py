@@ -1,23 +1,43 @@
+import math
 import os
 import signal
 import subprocess
 import operator
+import random
+import shlex
+import statistics
+import time
 
 import psutil
 from psutil._common import bytes2human
-import re
 from num2words import num2words
 import platform
 
-from PySide6.QtCharts import QChartView, QChart, QBarSeries, QBarCategoryAxis, QBarSet, QValueAxis
-from PySide6.QtCore import QThread, QSettings, Signal
+from PySide6.QtCharts import QChartView, QChart, QBarSeries, QBarCategoryAxis, QBarSet, QValueAxis, QBoxPlotSeries, \
+    QBoxSet, QLineSeries, QLogValueAxis
+from PySide6.QtCore import QThread, QSettings, Signal, QUrl
 from PySide6.QtGui import QPainter, QRegularExpressionValidator, Qt, QPdfWriter, QPixmap, QColor, QTextCursor, \
-    QTextCharFormat, QBrush, QFont
+    QTextCharFormat, QBrush, QFont, QDesktopServices
 from PySide6.QtWidgets import QMainWindow, QHBoxLayout, QLabel, QLineEdit, QSpacerItem, QSizePolicy, QPushButton, \
     QVBoxLayout, QWidget, QApplication, QFileDialog, QTextBrowser, QSplitter, QHeaderView, QTableWidget, \
     QTableWidgetItem, QAbstractItemView, QDialog, QMessageBox
 
 from settingsDialog import SettingsDialog
+from abTestDialog import ABTestDialog
+from benchStats import parseResults, meanCi, relCi, speedupCi, mannWhitneyU
+from profiler import PROFILE_DIR, perfAvailable, perfRecordCommand, perfScriptToFolded, writeFlamegraph
+from jobQueue import JOB_DB, JobQueue
+from jobQueueDialog import JobQueueDialog
+from report import collectReportData, writeReport
+
+# command of each language, times of calculation is appended as the last argument
+COMMAND_DICT = {
+    'Python': ['python', 'a.py'],
+    'R': ['Rscript', 'a.R'],
+    'Go': ['go', 'run', 'a.go'],
+    'Rust': ['cargo', 'run', '--release', '--'],
+    'Julia': ['julia', 'a.jl']
+}
 
 
 class TestThread(QThread):
@@ -26,12 +46,17 @@ class TestThread(QThread):
     # QFont is font of text
     updated = Signal(str, QColor, QFont)
     curTestFinished = Signal()
+    # language, path of flamegraph (svg)
+    profiled = Signal(str, str)
 
-    def __init__(self, n, langs_test_available_dict: dict, res_lst: list):
+    def __init__(self, n, langs_test_available_dict: dict, res_lst: list,
+                 target_rel_ci=0.02, time_budget=600, min_trials=3, max_trials=30, profile=False):
         super().__init__()
         # thread control variable
         self.__stopped = False
         self.__stoppedCurrentTest = False
+        # set by the subclass when the result can't be trusted (e.g. A/B test without result of every round)
+        self._failed = False
 
         # process (subprocess.Popen)
         self.__p = ''
@@ -39,65 +64,290 @@ class TestThread(QThread):
         # number of calculation
         self.__n = n
 
+        # variable which are related to trials
+        # keep running trials of each language until relative half width of 95% CI gets below target_rel_ci,
+        # total time_budget (seconds) is shared among the languages which are not tested yet
+        self.__target_rel_ci = target_rel_ci
+        self.__time_budget = time_budget
+        self.__min_trials = max(2, min_trials)
+        self.__max_trials = max(self.__min_trials, max_trials)
+
+        # run every language once more with profiler before its trials (not counted in the result)
+        self.__profile = profile
+
         # variable which are related to languages
         self.__langs_test_available_dict = langs_test_available_dict
-        self.__command_dict = {
-            'Python': ['python', 'a.py'],
-            'R': ['Rscript', 'a.R'],
-            'Go': ['go', 'run', 'a.go'],
-            'Rust': ['cargo', 'run', '--release', '--'],
-            'Julia': ['julia', 'a.jl']
-        }
+        self.__command_dict = COMMAND_DICT
         self.__res_lst = res_lst
         self.__res_lst.clear()
 
         # common font to emphasize the log about start/finish
-        self.__fnt = QFont('Arial', 10)
-        self.__fnt.setBold(True)
+        self._fnt = QFont('Arial', 10)
+        self._fnt.setBold(True)
 
     def stop(self):
         self.__stopped = True
+
+    def isFailed(self):
+        return self._failed
     
     # stop current language's test
     def stopCurrentLangTest(self, n):
         self.__stoppedCurrentTest = True
 
     def run(self):
-        for k, v in self.__langs_test_available_dict.items():
-            if v:
-                self.__p = subprocess.Popen(self.__command_dict[k] + [self.__n],
-                                     stdout=subprocess.PIPE,
-                                     stderr=subprocess.STDOUT,
-                                     text=True,
-                                     encoding='utf-8',
-                                     errors='replace'
-                                     )
-
-                self.updated.emit(f"{k} Test Started!", QColor(0, 155, 0), self.__fnt)
-                while True:
-                    # stop
-                    if self.__stopped:
-                        self.updated.emit(f"Test Stopped", QColor(155, 0, 0), self.__fnt)
-                        self.__stopped = False
-                        return
-                    realtime_output = self.__p.stdout.readline()
-                    if realtime_output == '' and self.__p.poll() is not None or self.__stoppedCurrentTest:
-                        break
-                    if realtime_output:
-                        # log with default color and text
-                        self.updated.emit(realtime_output.strip(), QColor(0, 0, 0), QApplication.font())
-                    self.__res_lst.append(realtime_output)
+        langs = [k for k, v in self.__langs_test_available_dict.items() if v]
+        # python is profiled by pySampler, others need perf
+        perf_available = self.__profile and any(k != 'Python' for k in langs) and perfAvailable()
+        start_time = time.time()
+        for i, k in enumerate(langs):
+            self.__stoppedCurrentTest = False
+            self.updated.emit(f"{k} Test Started!", QColor(0, 155, 0), self._fnt)
+
+            if self.__profile:
+                self.__runProfile(k, perf_available)
+                if self._handleStopped():
+                    return
+
+            lang_start_time = time.time()
+            # spread what is left of the budget evenly over the languages which are not tested yet
+            lang_budget = (self.__time_budget - (lang_start_time - start_time)) / (len(langs) - i)
+            samples = []
+            while True:
+                t = self._runTrial(self.__command_dict[k])
+                if self._handleStopped():
+                    return
                 if self.__stoppedCurrentTest:
-                    self.__curLangTestTimedOut(k)
-                else:
-                    self.__curLangTestFinished(k)
+                    break
+                # no result means the test itself failed, running it again won't help
+                if t is None:
+                    self.updated.emit(f'{k} printed no result', QColor(155, 0, 0), self._fnt)
+                    break
+                samples.append(t)
+                status = self.__convergenceStatus(samples, time.time() - lang_start_time, lang_budget)
+                self.__emitTrialStatus(k, samples, status)
+                if status:
+                    break
+            if self.__stoppedCurrentTest:
+                self.__curLangTestTimedOut(k)
+            else:
+                self.__curLangTestFinished(k)
+
+    # run the command once and return the seconds it printed (None if it printed nothing)
+    # output is not appended to the result if record is False
+    def _runTrial(self, command, record=True, n=None):
+        self.__p = subprocess.Popen(command + [n or self.__n],
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.STDOUT,
+                             text=True,
+                             encoding='utf-8',
+                             errors='replace'
+                             )
+        t = None
+        while True:
+            # stop
+            if self.__stopped:
+                return t
+            realtime_output = self.__p.stdout.readline()
+            if realtime_output == '' and self.__p.poll() is not None or self.__stoppedCurrentTest:
+                break
+            if realtime_output:
+                # log with default color and text
+                self.updated.emit(realtime_output.strip(), QColor(0, 0, 0), QApplication.font())
+                res = parseResults([realtime_output])
+                if res:
+                    t = res[0][1]
+            if record:
+                self.__res_lst.append(realtime_output)
+        return t
+
+    def __runProfile(self, k, perf_available):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base_path = os.path.join(PROFILE_DIR, f'{k}_{self.__n}')
+        folded_path = base_path + '.folded'
+        svg_path = base_path + '.svg'
+        if os.path.exists(folded_path):
+            os.remove(folded_path)
+
+        self.updated.emit(f'{k} Profiling...', QColor(120, 120, 120), QApplication.font())
+        if k == 'Python':
+            self._runTrial(['python', 'pySampler.py', folded_path] + self.__command_dict[k][1:], record=False)
+        elif perf_available:
+            data_path = base_path + '.perf.data'
+            try:
+                self._runTrial(perfRecordCommand(self.__command_dict[k], data_path), record=False)
+                if os.path.exists(data_path) and not perfScriptToFolded(data_path, folded_path):
+                    self.updated.emit(f'perf script failed to read {os.path.abspath(data_path)}, {k} is not profiled',
+                                      QColor(155, 0, 0), QApplication.font())
+                    return
+            finally:
+                # perf data with call graph is huge, collapsed stacks are all that is needed
+                if os.path.exists(data_path):
+                    os.remove(data_path)
+        else:
+            self.updated.emit(f'perf is not installed or not permitted (see /proc/sys/kernel/perf_event_paranoid), '
+                              f'{k} is not profiled', QColor(155, 0, 0), QApplication.font())
+            return
+
+        if os.path.exists(folded_path) and writeFlamegraph(folded_path, svg_path, f'{k} (times: {self.__n})'):
+            self.profiled.emit(k, os.path.abspath(svg_path))
+            self.updated.emit(f'{k} Profile saved in {os.path.abspath(svg_path)}', QColor(120, 120, 120),
+                              QApplication.font())
+        else:
+            self.updated.emit(f'{k} Profile failed', QColor(155, 0, 0), QApplication.font())
+
+    # return True (and reset the flag) if the whole test was stopped
+    def _handleStopped(self):
+        if self.__stopped:
+            self.updated.emit(f"Test Stopped", QColor(155, 0, 0), self._fnt)
+            self.__stopped = False
+            return True
+        return False
+
+    # empty string means that more trials are needed
+    def __convergenceStatus(self, samples, elapsed, lang_budget):
+        if len(samples) >= self.__min_trials and relCi(samples) <= self.__target_rel_ci:
+            return 'Converged'
+        if len(samples) >= self.__max_trials:
+            return 'Max trials reached'
+        if elapsed >= lang_budget:
+            return 'Time budget spent'
+        return ''
+
+    def __emitTrialStatus(self, k, samples, status):
+        mean, half = meanCi(samples)
+        rel = relCi(samples)
+        rel_text = f'±{rel * 100:.2f}%' if math.isfinite(rel) else '±?'
+        text = f'{k} trial {len(samples)}: mean {mean:.6f} seconds {rel_text} ' \
+               f'(target ±{self.__target_rel_ci * 100:.2f}%)'
+        if status:
+            self.updated.emit(f'{text} - {status}', QColor(0, 0, 200), QApplication.font())
+        else:
+            self.updated.emit(text, QColor(120, 120, 120), QApplication.font())
 
     def __curLangTestFinished(self, k):
         self.curTestFinished.emit()
-        self.updated.emit(f'{k} Test Finished!', QColor(0, 0, 200), self.__fnt)
+        self.updated.emit(f'{k} Test Finished!', QColor(0, 0, 200), self._fnt)
+
+    def __curLangTestTimedOut(self, k):
+        self.curTestFinished.emit()
+        self.updated.emit(f'{k} Test Stopped', QColor(155, 0, 0), self._fnt)
 
+    # None before the first trial is started
     def currentProcessPid(self):
-        return self.__p.pid
+        return self.__p.pid if self.__p else None
+
+    # last resort if the test doesn't exit with SIGINT, children (e.g. binary built by "go run") are killed too
+    def killCurrentProcess(self):
+        pid = self.currentProcessPid()
+        if pid is None:
+            return
+        try:
+            proc = psutil.Process(pid)
+            for child in proc.children(recursive=True):
+                child.kill()
+            proc.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+
+class ABTestThread(TestThread):
+    # run two commands (A and B) in turn to compare them with each other
+    def __init__(self, n, variant_dict: dict, rounds, ab_res_dict: dict):
+        super().__init__(n, {}, [])
+        # name of variant: command line
+        self.__variant_dict = variant_dict
+        self.__rounds = rounds
+        # name of variant: list of seconds
+        self.__ab_res_dict = ab_res_dict
+        self.__ab_res_dict.clear()
+
+    def run(self):
+        names = list(self.__variant_dict.keys())
+        for name in names:
+            self.__ab_res_dict[name] = []
+        self.updated.emit(f"A/B Test Started! ({' vs '.join(names)})", QColor(0, 155, 0), self._fnt)
+        for i in range(self.__rounds):
+            # randomize the order in every round, so thermal/load drift affects both of them alike
+            order = random.sample(names, len(names))
+            for name in order:
+                t = self._runTrial(shlex.split(self.__variant_dict[name]))
+                if self._handleStopped():
+                    return
+                if t is None:
+                    # partial result would give a wrong verdict, so the whole A/B test fails
+                    self._failed = True
+                    self.updated.emit(f'{name} printed no result, A/B Test Failed', QColor(155, 0, 0), self._fnt)
+                    return
+                self.__ab_res_dict[name].append(t)
+            a, b = [self.__ab_res_dict[name] for name in names]
+            speedup = statistics.mean(a) / statistics.mean(b)
+            self.updated.emit(f"Round {i + 1}/{self.__rounds} ({' → '.join(order)}): "
+                              f"speedup of {names[1]} over {names[0]} is {speedup:.3f}x so far",
+                              QColor(120, 120, 120), QApplication.font())
+        self.curTestFinished.emit()
+        self.updated.emit(f'A/B Test Finished!', QColor(0, 0, 200), self._fnt)
+
+
+class QueueThread(TestThread):
+    # run pending jobs of the job queue one by one, every result is saved as soon as the job is finished
+    # id of job
+    jobUpdated = Signal(int)
+
+    def __init__(self, job_db=JOB_DB):
+        super().__init__('', {}, [])
+        self.__job_db = job_db
+
+    def run(self):
+        # connection of sqlite can't be shared with other thread
+        queue = JobQueue(self.__job_db)
+        try:
+            queue.resetRunning()
+            self.updated.emit(f'Job Queue Started! ({queue.pendingCount()} jobs pending)', QColor(0, 155, 0),
+                              self._fnt)
+            # pick next job every time, so jobs reordered/cancelled while running are respected
+            job = queue.nextPending()
+            while job is not None:
+                queue.markRunning(job['id'])
+                self.jobUpdated.emit(job['id'])
+                t = self._runTrial(shlex.split(job['command']), record=False, n=job['n'])
+                if self._handleStopped():
+                    # unfinished job will be done again when resumed
+                    queue.markPending(job['id'])
+                    self.jobUpdated.emit(job['id'])
+                    return
+                if t is None:
+                    queue.markFailed(job['id'])
+                    self.updated.emit(f"{job['language']} printed no result (times: {job['n']}, trial: {job['trial']})",
+                                      QColor(155, 0, 0), self._fnt)
+                else:
+                    queue.markDone(job['id'], t)
+                self.jobUpdated.emit(job['id'])
+                self.updated.emit(f"{queue.pendingCount()} jobs left", QColor(120, 120, 120), QApplication.font())
+                job = queue.nextPending()
+            self.curTestFinished.emit()
+            self.updated.emit(f'Job Queue Finished!', QColor(0, 0, 200), self._fnt)
+        finally:
+            queue.close()
+
+
+class ReportThread(QThread):
+    # path of the report
+    reported = Signal(str)
+    # error message
+    failed = Signal(str)
+
+    def __init__(self, filename, data: dict):
+        super().__init__()
+        self.__filename = filename
+        self.__data = data
+
+    def run(self):
+        try:
+            writeReport(self.__filename, self.__data)
+            self.reported.emit(self.__filename)
+        except Exception as e:
+            self.failed.emit(str(e))
 
 
 class TestMonitorThread(QThread):
@@ -109,7 +359,11 @@ class TestMonitorThread(QThread):
 
     def stop(self, pid=None):
         if pid:
-            os.kill(pid, signal.SIGINT)
+            # process may be finished already
+            try:
+                os.kill(pid, signal.SIGINT)
+            except ProcessLookupError:
+                pass
         self.__stopped = True
 
     def run(self) -> None:
@@ -132,10 +386,18 @@ class MainWindow(QMainWindow):
     def __initVal(self):
         self.__langs_test_available_dict = {}
         self.__res_lst = []
+        # result of A/B test (name of variant: list of seconds)
+        self.__ab_res_dict = {}
+        # flamegraph of each language (language: path of svg)
+        self.__profile_dict = {}
+        # mean seconds of sweep (times: {language: seconds})
+        self.__sweep_dict = {}
         self.__t_deleted = False
         # Thread for running test
         self.__testThread = ''
         self.__usageMoniterThread = ''
+        # Thread for making report
+        self.__reportThread = ''
 
     def __initSettings(self):
         # [Languages]
@@ -145,6 +407,23 @@ class MainWindow(QMainWindow):
             v = int(self.__settingsStruct.value(k, 1))
             self.__langs_test_available_dict[k] = v
         self.__settingsStruct.endGroup()
+        self.__initTrialsSettings()
+        self.__initProfileSettings()
+
+    def __initTrialsSettings(self):
+        # [Trials]
+        self.__settingsStruct.beginGroup('Trials')
+        self.__target_rel_ci = float(self.__settingsStruct.value('TargetRelCI', 2)) / 100
+        self.__time_budget = int(self.__settingsStruct.value('TimeBudget', 600))
+        self.__min_trials = int(self.__settingsStruct.value('MinTrials', 3))
+        self.__max_trials = int(self.__settingsStruct.value('MaxTrials', 30))
+        self.__settingsStruct.endGroup()
+
+    def __initProfileSettings(self):
+        # [Profile]
+        self.__settingsStruct.beginGroup('Profile')
+        self.__profile = bool(int(self.__settingsStruct.value('Enabled', 0)))
+        self.__settingsStruct.endGroup()
 
     def __initUi(self):
         self.setWindowTitle('Language Comparison')
@@ -168,10 +447,20 @@ class MainWindow(QMainWindow):
         self.__runTestBtn = QPushButton('Run Test')
         self.__runTestBtn.clicked.connect(self.__run)
 
+        self.__abTestBtn = QPushButton('A/B Test')
+        self.__abTestBtn.clicked.connect(self.__runABTest)
+
+        # it is enabled even while running, to reorder/cancel the jobs
+        self.__jobQueueBtn = QPushButton('Job Queue')
+        self.__jobQueueBtn.clicked.connect(self.__openJobQueue)
+
         self.__saveBtn = QPushButton('Save')
         self.__saveBtn.clicked.connect(self.__save)
         self.__saveBtn.setEnabled(False)
 
+        self.__reportBtn = QPushButton('Report')
+        self.__reportBtn.clicked.connect(self.__report)
+
         lay = QHBoxLayout()
         lay.addWidget(QLabel('Times'))
         lay.addWidget(self.__timesLineEdit)
@@ -179,7 +468,10 @@ class MainWindow(QMainWindow):
         lay.addSpacerItem(QSpacerItem(10, 10, QSizePolicy.MinimumExpanding))
         lay.addWidget(self.__settingsBtn)
         lay.addWidget(self.__runTestBtn)
+        lay.addWidget(self.__abTestBtn)
+        lay.addWidget(self.__jobQueueBtn)
         lay.addWidget(self.__saveBtn)
+        lay.addWidget(self.__reportBtn)
         lay.setContentsMargins(0, 0, 0, 0)
 
         topWidget = QWidget()
@@ -191,6 +483,16 @@ class MainWindow(QMainWindow):
         self.__series.append(barset)
         self.__series.setLabelsVisible(True)
 
+        # distribution of A/B test, shown instead of bar series after A/B test
+        self.__boxSeries = QBoxPlotSeries()
+        self.__boxSeries.setName('Time')
+
+        # x axis of sweep, which is shown instead of category axis after job queue of several times
+        self.__sweepAxisX = QLogValueAxis()
+        self.__sweepAxisX.setBase(10)
+        self.__sweepAxisX.setLabelFormat('%.0e')
+        self.__sweepAxisX.setTitleText('Times')
+
         self.__axisX = QBarCategoryAxis()
 
         self.__axisY = QValueAxis()
@@ -236,8 +538,8 @@ class MainWindow(QMainWindow):
 
         self.__tableWidget = QTableWidget()
         self.__tableWidget.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        self.__tableWidget.setColumnCount(1)
-        self.__tableWidget.setHorizontalHeaderLabels(['Time'])
+        self.__tableWidget.setColumnCount(3)
+        self.__tableWidget.setHorizontalHeaderLabels(['Time', 'Trials', '95% CI'])
         self.__tableWidget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.__tableWidget.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
@@ -306,13 +608,49 @@ class MainWindow(QMainWindow):
         reply = dialog.exec()
         if reply == QDialog.Accepted:
             self.__langs_test_available_dict = dialog.getLangsDict()
+            self.__initTrialsSettings()
+            self.__initProfileSettings()
 
     def __run(self):
         n = self.__timesLineEdit.text().replace(',', '')
-        
+        testThread = TestThread(n, self.__langs_test_available_dict, self.__res_lst,
+                                target_rel_ci=self.__target_rel_ci, time_budget=self.__time_budget,
+                                min_trials=self.__min_trials, max_trials=self.__max_trials,
+                                profile=self.__profile)
+        self.__profile_dict.clear()
+        testThread.profiled.connect(self.__handleProfiled)
+        self.__startTestThread(testThread)
+
+    def __runABTest(self):
+        dialog = ABTestDialog()
+        reply = dialog.exec()
+        if reply == QDialog.Accepted:
+            n = self.__timesLineEdit.text().replace(',', '')
+            testThread = ABTestThread(n, dialog.getVariantDict(), dialog.getRounds(), self.__ab_res_dict)
+            self.__startTestThread(testThread)
+
+    def __isTestRunning(self):
+        return isinstance(self.__testThread, QThread) and not self.__t_deleted
+
+    def __openJobQueue(self):
+        running = self.__isTestRunning()
+        command_dict = {k: COMMAND_DICT[k] for k, v in self.__langs_test_available_dict.items() if v}
+        dialog = JobQueueDialog(command_dict, running)
+        queue_running = running and isinstance(self.__testThread, QueueThread)
+        if queue_running:
+            self.__testThread.jobUpdated.connect(dialog.refresh)
+        reply = dialog.exec()
+        # thread is deleted if it finished while the dialog was open
+        if queue_running and not self.__t_deleted:
+            self.__testThread.jobUpdated.disconnect(dialog.refresh)
+        if reply == QDialog.Accepted and not self.__isTestRunning():
+            self.__profile_dict.clear()
+            self.__startTestThread(QueueThread())
+
+    def __startTestThread(self, testThread):
         self.__usageMoniterThread = TestMonitorThread()
-        
-        self.__testThread = TestThread(n, self.__langs_test_available_dict, self.__res_lst)
+
+        self.__testThread = testThread
 
         self.__testThread.curTestFinished.connect(self.__usageMoniterThread.resetTime)
         self.__usageMoniterThread.timeElapsed.connect(self.__testThread.stopCurrentLangTest)
@@ -323,6 +661,9 @@ class MainWindow(QMainWindow):
         self.__testThread.finished.connect(self.__handleTestFinished)
         self.__testThread.start()
 
+    def __handleProfiled(self, k, path):
+        self.__profile_dict[k] = path
+
     def __prepareLogBrowser(self):
         if self.__middleWidget.isVisible():
             self.__logBrowser.clear()
@@ -354,6 +695,7 @@ class MainWindow(QMainWindow):
         self.__logLbl.setText('Running the test...')
         self.__timesLineEdit.setEnabled(False)
         self.__runTestBtn.setEnabled(False)
+        self.__abTestBtn.setEnabled(False)
         self.__settingsBtn.setEnabled(False)
         self.__saveBtn.setEnabled(False)
         self.__stopBtn.setEnabled(True)
@@ -367,19 +709,31 @@ class MainWindow(QMainWindow):
     def __handleTestFinished(self):
         self.__timesLineEdit.setEnabled(True)
         self.__runTestBtn.setEnabled(True)
+        self.__abTestBtn.setEnabled(True)
         self.__settingsBtn.setEnabled(True)
         self.__stopBtn.setEnabled(False)
-        if self.__isTestFinished():
+        if self.__testThread.isFailed():
+            self.__logLbl.setText('Failed')
+            self.__usageMoniterThread.stop()
+        elif self.__isTestFinished():
             self.__logLbl.setText('Finished')
             self.__usageMoniterThread.stop()
             self.__updateLog('Finished!', QColor(0, 0, 0), QApplication.font())
-            self.__setChart()
+            if isinstance(self.__testThread, ABTestThread):
+                self.__setABChart()
+            elif isinstance(self.__testThread, QueueThread):
+                self.__setQueueChart()
+            else:
+                self.__setChart()
             self.__saveBtn.setEnabled(True)
         else:
             self.__logLbl.setText('Stopped')
 
         # set thread deleted flag for preventing runtime error
         self.__t_deleted = True
+        # monitor may still be running for a moment after stop(), it can't be deleted while running
+        self.__usageMoniterThread.stop()
+        self.__usageMoniterThread.wait()
         self.__usageMoniterThread.deleteLater()
         self.__testThread.deleteLater()
 
@@ -394,41 +748,185 @@ class MainWindow(QMainWindow):
                 reduced_n_text = n-(n % pow(10, len(str(n))-2))
                 self.__timesNameLbl.setText(f"about {num2words(reduced_n_text)}")
 
+    # show only the given series on the chart
+    def __showSeries(self, series_lst, axisX=None):
+        axisX = axisX or self.__axisX
+        for s in self.__chart.series():
+            if s not in series_lst:
+                self.__chart.removeSeries(s)
+        for axis in self.__chart.axes(Qt.Horizontal):
+            if axis is not axisX:
+                self.__chart.removeAxis(axis)
+        if axisX not in self.__chart.axes(Qt.Horizontal):
+            self.__chart.addAxis(axisX, Qt.AlignBottom)
+        for series in series_lst:
+            if series not in self.__chart.series():
+                self.__chart.addSeries(series)
+                series.attachAxis(axisX)
+                series.attachAxis(self.__axisY)
+
+    # column for the link of flamegraph is added only when there is any
+    def __setTableColumns(self, profile):
+        labels = ['Time', 'Trials', '95% CI'] + (['Profile'] if profile else [])
+        # remove the links of previous test
+        self.__tableWidget.setColumnCount(3)
+        self.__tableWidget.setColumnCount(len(labels))
+        self.__tableWidget.setHorizontalHeaderLabels(labels)
+
+    def __getProfileLinkLabel(self, path):
+        lbl = QLabel(f'<a href="{QUrl.fromLocalFile(path).toString()}">Flamegraph</a>')
+        lbl.setAlignment(Qt.AlignCenter)
+        lbl.setOpenExternalLinks(True)
+        return lbl
+
     def __setChart(self):
         try:
-            self.__tableWidget.clearContents()
-            lst = []
-            for res in self.__res_lst:
-                fs = re.findall(r'([\w]+):\s([\d\\.]+)\sseconds', res)
-                for f in fs:
-                    k, v = f
-                    lst.append([k, float(v)])
-
-            lst = sorted(lst, key=operator.itemgetter(1))
-            barSet = self.__series.barSets()[0]
-            barSet.remove(0, barSet.count())
-            langs = [item[0] for item in lst]
+            # every language may have been run several times, show the mean of its trials
+            samples_dict = {}
+            for k, v in parseResults(self.__res_lst):
+                samples_dict.setdefault(k, []).append(v)
+            self.__setBarChart(samples_dict)
+        except Exception as e:
+            print(e)
 
-            self.__axisX.clear()
-            self.__axisX.append(langs)
-            self.__axisY.setRange(0, max([float(item[1]) for item in lst]))
+    # samples_dict is {language: list of seconds}
+    def __setBarChart(self, samples_dict):
+        self.__showSeries([self.__series])
+        self.__tableWidget.clearContents()
+        lst = [[k, *meanCi(v), len(v)] for k, v in samples_dict.items()]
+
+        lst = sorted(lst, key=operator.itemgetter(1))
+        barSet = self.__series.barSets()[0]
+        barSet.remove(0, barSet.count())
+        langs = [item[0] for item in lst]
+
+        self.__axisX.clear()
+        self.__axisX.append(langs)
+        self.__axisY.setRange(0, max([float(item[1]) for item in lst]))
+
+        self.__tableWidget.setRowCount(len(langs))
+        self.__tableWidget.setVerticalHeaderLabels(langs)
+        self.__setTableColumns(bool(self.__profile_dict))
+
+        for i in range(len(lst)):
+            k, v, half, cnt = lst[i]
+            barSet <<= float(v)
+            ci_text = f'±{half:.6f} (±{relCi(samples_dict[k]) * 100:.2f}%)' if math.isfinite(half) else '-'
+            for j, text in enumerate([f'{v:.6f}', str(cnt), ci_text]):
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignCenter)
+                self.__tableWidget.setItem(i, j, item)
+            if k in self.__profile_dict:
+                self.__tableWidget.setCellWidget(i, 3, self.__getProfileLinkLabel(self.__profile_dict[k]))
 
-            self.__tableWidget.setRowCount(len(langs))
-            self.__tableWidget.setVerticalHeaderLabels(langs)
+        self.__axisX.setTitleText('Language')
+        self.__axisY.setTitleText('Seconds')
+
+        self.__totalLbl.setText(
+            f'Count of Calculation: {self.__timesLineEdit.text()} ({self.__timesNameLbl.text()})')
+
+    # show every finished job of the queue, as bar chart if only one times is in it or sweep curves if not
+    def __setQueueChart(self):
+        try:
+            queue = JobQueue()
+            results = queue.results()
+            queue.close()
+
+            n_samples_dict = {}
+            for job in results:
+                n_samples_dict.setdefault(int(job['n']), {}).setdefault(job['language'], []).append(job['seconds'])
+            if not n_samples_dict:
+                return
+            if len(n_samples_dict) == 1:
+                n, samples_dict = list(n_samples_dict.items())[0]
+                self.__timesLineEdit.setText(f'{n:,}')
+                self.__textEdited(self.__timesLineEdit.text())
+                self.__setBarChart(samples_dict)
+            else:
+                self.__setSweepChart(n_samples_dict)
+        except Exception as e:
+            print(e)
 
-            for i in range(len(lst)):
-                v = lst[i][1]
-                barSet <<= float(v)
-                item = QTableWidgetItem(str(v))
+    # n_samples_dict is {times: {language: list of seconds}}
+    def __setSweepChart(self, n_samples_dict):
+        ns = sorted(n_samples_dict.keys())
+        langs = sorted(set(k for samples_dict in n_samples_dict.values() for k in samples_dict.keys()))
+        self.__sweep_dict = {n: {k: statistics.mean(v) for k, v in n_samples_dict[n].items()} for n in ns}
+
+        series_lst = []
+        for k in langs:
+            series = QLineSeries()
+            series.setName(k)
+            series.setPointsVisible(True)
+            for n in ns:
+                if k in self.__sweep_dict[n]:
+                    series.append(n, self.__sweep_dict[n][k])
+            series_lst.append(series)
+        self.__showSeries(series_lst, self.__sweepAxisX)
+
+        self.__sweepAxisX.setRange(ns[0], ns[-1])
+        self.__axisY.setRange(0, max(max(v.values()) for v in self.__sweep_dict.values()))
+        self.__axisY.setTitleText('Seconds')
+
+        self.__tableWidget.clearContents()
+        self.__tableWidget.setColumnCount(len(ns))
+        self.__tableWidget.setHorizontalHeaderLabels([f'{n:,}' for n in ns])
+        self.__tableWidget.setRowCount(len(langs))
+        self.__tableWidget.setVerticalHeaderLabels(langs)
+        for i, k in enumerate(langs):
+            for j, n in enumerate(ns):
+                text = f'{self.__sweep_dict[n][k]:.6f}' if k in self.__sweep_dict[n] else '-'
+                item = QTableWidgetItem(text)
                 item.setTextAlignment(Qt.AlignCenter)
-                self.__tableWidget.setItem(i, 0, item)
+                self.__tableWidget.setItem(i, j, item)
+
+        self.__totalLbl.setText(f'Count of Calculation: {", ".join(f"{n:,}" for n in ns)}')
+
+    def __setABChart(self):
+        try:
+            # verdict is given only when every round has the result of both A and B
+            samples_lst = list(self.__ab_res_dict.values())
+            if len(samples_lst) != 2 or not all(samples_lst) or len(samples_lst[0]) != len(samples_lst[1]):
+                self.__updateLog('A/B Test is incomplete, no result', QColor(155, 0, 0), QApplication.font())
+                return
+
+            self.__showSeries([self.__boxSeries])
+            self.__tableWidget.clearContents()
+            self.__boxSeries.clear()
+
+            names = list(self.__ab_res_dict.keys())
 
-            self.__axisX.setTitleText('Language')
+            self.__axisX.clear()
+            self.__axisX.append(names)
+            self.__axisY.setRange(0, max([max(samples) for samples in samples_lst]))
+
+            self.__tableWidget.setRowCount(len(names))
+            self.__tableWidget.setVerticalHeaderLabels(names)
+            self.__setTableColumns(False)
+
+            for i in range(len(names)):
+                samples = samples_lst[i]
+                q1, median, q3 = statistics.quantiles(samples, n=4, method='inclusive')
+                self.__boxSeries.append(QBoxSet(min(samples), q1, median, q3, max(samples), names[i]))
+
+                v, half = meanCi(samples)
+                ci_text = f'±{half:.6f} (±{relCi(samples) * 100:.2f}%)'
+                for j, text in enumerate([f'{v:.6f}', str(len(samples)), ci_text]):
+                    item = QTableWidgetItem(text)
+                    item.setTextAlignment(Qt.AlignCenter)
+                    self.__tableWidget.setItem(i, j, item)
+
+            self.__axisX.setTitleText('Variant')
             self.__axisY.setTitleText('Seconds')
 
+            a, b = samples_lst
+            speedup, low, high = speedupCi(a, b)
+            u, p = mannWhitneyU(a, b)
+            result = f'Speedup of {names[1]} over {names[0]}: {speedup:.3f}x (95% CI {low:.3f}x - {high:.3f}x), ' \
+                     f'Mann-Whitney U={u:.1f}, p={p:.4g}'
+            self.__updateLog(result, QColor(0, 0, 200), QApplication.font())
             self.__totalLbl.setText(
-                f'Count of Calculation: {self.__timesLineEdit.text()} ({self.__timesNameLbl.text()})')
-
+                f'Count of Calculation: {self.__timesLineEdit.text()} ({self.__timesNameLbl.text()})\n{result}')
 
         except Exception as e:
             print(e)
@@ -464,13 +962,69 @@ class MainWindow(QMainWindow):
                 p.end()
                 pixmap.save(filename, ext)
 
+            self.__showInFolder(filename)
+
+    def __showInFolder(self, filename):
+        if platform.system() == 'Windows':
             path = filename.replace('/', '\\')
             subprocess.Popen(r'explorer /select,"' + path + '"')
+        else:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.dirname(os.path.abspath(filename))))
+
+    # every result (chart of the last test, A/B test and job queue) in one file, made in another thread
+    def __report(self):
+        filename = QFileDialog.getSaveFileName(self, 'Report', '.', 'HTML (*.html);;'
+                                                                    'PDF (*.pdf)')
+        ext = filename[1].split('(')[0].strip()
+        filename = filename[0]
+        if filename:
+            if not os.path.splitext(filename)[1]:
+                filename += '.pdf' if ext == 'PDF' else '.html'
+            results = {}
+            for k, v in parseResults(self.__res_lst):
+                results.setdefault(k, []).append(v)
+            # copy everything, so the next test doesn't change the data while the report is being made
+            data = collectReportData(results=results, ab={k: list(v) for k, v in self.__ab_res_dict.items()},
+                                     times=self.__timesLineEdit.text(), device=self.__pcInfo.toPlainText())
+            self.__reportBtn.setEnabled(False)
+            self.__reportThread = ReportThread(filename, data)
+            self.__reportThread.reported.connect(self.__handleReported)
+            self.__reportThread.failed.connect(self.__handleReportFailed)
+            self.__reportThread.finished.connect(self.__handleReportFinished)
+            self.__reportThread.start()
+
+    def __handleReported(self, filename):
+        self.__showInFolder(filename)
+
+    def __handleReportFailed(self, text):
+        QMessageBox.critical(self, 'Report', f'Failed to make the report.\n{text}')
+
+    def __handleReportFinished(self):
+        self.__reportBtn.setEnabled(True)
+        self.__reportThread.deleteLater()
+        self.__reportThread = ''
 
     def closeEvent(self, e):
+        # report is written in a moment, wait for it rather than leaving a broken file
+        if isinstance(self.__reportThread, QThread):
+            self.__reportThread.wait()
         if isinstance(self.__testThread, QThread):
             if self.__t_deleted:
                 e.accept()
+            elif isinstance(self.__testThread, QueueThread):
+                # finished jobs are already saved, so job queue can be resumed later
+                reply = QMessageBox.question(self, 'Job Queue',
+                                             'Stop the job queue and close? Finished jobs are kept '
+                                             'and the rest can be resumed from "Job Queue".')
+                if reply == QMessageBox.Yes:
+                    self.__stop()
+                    # give the current job a moment to exit with SIGINT, and kill it if it doesn't
+                    if not self.__testThread.wait(5000):
+                        self.__testThread.killCurrentProcess()
+                        self.__testThread.wait()
+                    e.accept()
+                else:
+                    e.ignore()
             else:
                 QMessageBox.critical(self, 'Warning',
                                            'You can\'t close while running test.')
@@ -0,0 +1,150 @@
+import collections
+import html
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import zlib
+
+# collapsed stacks and flamegraphs of each language are saved here as "<language>_<times>.folded/svg"
+PROFILE_DIR = 'profiles'
+
+_OFFSET_PATTERN = re.compile(r'\+0x[0-9a-f]+$')
+
+# "go run" and "cargo run" are recorded with the test binary they build and run,
+# samples of these toolchain processes are not a part of the test
+TOOLCHAIN_COMMS = {'go', 'compile', 'link', 'asm', 'cgo', 'vet', 'buildid', 'cargo', 'rustc', 'cc', 'cc1', 'ld',
+                   'as', 'collect2', 'rust-lld'}
+
+
+def perfAvailable():
+    """ Check if perf exists and this user is permitted to record with it """
+    if not shutil.which('perf'):
+        return False
+    with tempfile.TemporaryDirectory() as d:
+        try:
+            p = subprocess.run(['perf', 'record', '-q', '-o', os.path.join(d, 'probe.data'), '--', 'true'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+        except (OSError, subprocess.SubprocessError):
+            return False
+        return p.returncode == 0
+
+
+def perfRecordCommand(command, data_path):
+    # -g for call graph, child processes (e.g. binary built by "go run") are followed by default
+    return ['perf', 'record', '-q', '-F', '999', '-g', '-o', data_path, '--'] + command
+
+
+def collapsePerfScript(lines, exclude_comms=TOOLCHAIN_COMMS):
+    """ Turn output of "perf script" into collapsed stacks ({"comm;root;...;leaf": count}) """
+    stacks = collections.Counter()
+    comm = ''
+    frames = []
+    for line in list(lines) + ['']:
+        line = line.rstrip('\n')
+        if not line.strip():
+            if comm and comm not in exclude_comms:
+                # perf script lists the leaf first
+                stacks[';'.join([comm] + frames[::-1])] += 1
+            comm = ''
+            frames = []
+        elif line[0].isspace():
+            fields = line.strip().split(maxsplit=1)
+            sym = fields[1].rsplit(' (', 1)[0] if len(fields) > 1 else '[unknown]'
+            frames.append(_OFFSET_PATTERN.sub('', sym).replace(';', ':'))
+        else:
+            # header like "go 1234 [000] 1.234: 1010101 cycles:u:"
+            comm = line.split()[0].replace(';', ':')
+    return stacks
+
+
+def perfScriptToFolded(data_path, folded_path):
+    p = subprocess.run(['perf', 'script', '-i', data_path], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                       text=True, encoding='utf-8', errors='replace')
+    if p.returncode != 0:
+        return False
+    writeFolded(collapsePerfScript(p.stdout.splitlines()), folded_path)
+    return True
+
+
+def writeFolded(stacks, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, cnt in sorted(stacks.items()):
+            f.write(f'{stack} {cnt}\n')
+
+
+def readFolded(path):
+    stacks = collections.Counter()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            stack, _, cnt = line.rstrip('\n').rpartition(' ')
+            if stack and cnt.isdigit():
+                stacks[stack] += int(cnt)
+    return stacks
+
+
+def _color(name):
+    # same function always gets the same warm color
+    h = zlib.crc32(name.encode('utf-8'))
+    return f'rgb({205 + h % 50},{80 + (h >> 8) % 150},{(h >> 16) % 55})'
+
+
+def flamegraphSvg(stacks, title, width=1200, frame_height=16):
+    """ Render collapsed stacks as a self-contained SVG flamegraph (root at the bottom) """
+    # tree node: [count, {child name: node}]
+    root = [0, {}]
+    for stack, cnt in stacks.items():
+        node = root
+        node[0] += cnt
+        for name in stack.split(';'):
+            node = node[1].setdefault(name, [0, {}])
+            node[0] += cnt
+
+    rects = []
+    depth_max = 0
+    total = root[0] or 1
+    todo = [(root, 'all', 0.0, 0)]
+    while todo:
+        node, name, x, depth = todo.pop()
+        depth_max = max(depth_max, depth)
+        rects.append((name, node[0], x, depth))
+        child_x = x
+        for child_name, child in sorted(node[1].items()):
+            todo.append((child, child_name, child_x, depth + 1))
+            child_x += child[0]
+
+    top = 40
+    height = top + (depth_max + 1) * frame_height + 10
+    scale = (width - 20) / total
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+           f'font-family="Verdana" font-size="12">',
+           f'<rect width="100%" height="100%" fill="#f8f8f8"/>',
+           f'<text x="{width / 2}" y="24" text-anchor="middle" font-size="16">{html.escape(title)}</text>']
+    for name, cnt, x, depth in rects:
+        w = cnt * scale
+        if w < 0.1:
+            continue
+        rx = 10 + x * scale
+        ry = height - 10 - (depth + 1) * frame_height
+        label = html.escape(name)
+        out.append(f'<g><title>{label} ({cnt} samples, {cnt * 100 / total:.2f}%)</title>'
+                   f'<rect x="{rx:.2f}" y="{ry}" width="{w:.2f}" height="{frame_height - 1}" '
+                   f'fill="{_color(name)}" rx="2"/>')
+        # roughly 7 pixels per character
+        chars = int((w - 6) / 7)
+        if chars >= 3:
+            text = name if len(name) <= chars else name[:chars - 2] + '..'
+            out.append(f'<text x="{rx + 3:.2f}" y="{ry + frame_height - 4}">{html.escape(text)}</text>')
+        out.append('</g>')
+    out.append('</svg>')
+    return '\n'.join(out)
+
+
+def writeFlamegraph(folded_path, svg_path, title):
+    stacks = readFolded(folded_path)
+    if not stacks:
+        return False
+    with open(svg_path, 'w', encoding='utf-8') as f:
+        f.write(flamegraphSvg(stacks, title))
+    return True
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# sampling profiler for python test
+# usage: python pySampler.py <output.folded> <script.py> [args...]
+import collections
+import os
+import runpy
+import sys
+import threading
+import time
+
+from profiler import writeFolded
+
+INTERVAL = 0.001
+
+
+def main():
+    folded_path, script = sys.argv[1], sys.argv[2]
+    # script sees its own arguments only, like it is executed directly
+    sys.argv = sys.argv[2:]
+
+    stacks = collections.Counter()
+    main_id = threading.get_ident()
+    sampler_file = os.path.abspath(__file__)
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            frame = sys._current_frames().get(main_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                # frames of this sampler and runpy (which may be frozen) are not a part of the test
+                if frame.f_globals.get('__name__') != 'runpy' and os.path.abspath(code.co_filename) != sampler_file:
+                    names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if names:
+                stacks[';'.join(['python'] + names[::-1])] += 1
+            time.sleep(INTERVAL)
+
+    # let the sampler take the GIL as often as it wants to sample
+    sys.setswitchinterval(INTERVAL)
+    t = threading.Thread(target=sample, daemon=True)
+    t.start()
+    try:
+        runpy.run_path(script, run_name='__main__')
+    finally:
+        done.set()
+        t.join()
+        writeFolded(stacks, folded_path)
+
+
+if __name__ == '__main__':
+    main()
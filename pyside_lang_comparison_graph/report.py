@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+# report of every result (bars, distributions, A/B, sweep curves, trends) as one html or pdf file
+# charts are made as svg without any widget, so it can be done in worker thread or without display
+# usage: python report.py -o report.html [--jobs jobs.db]
+import argparse
+import datetime
+import html
+import json
+import math
+import os
+import statistics
+import textwrap
+
+from benchStats import meanCi, speedupCi, mannWhitneyU
+from jobQueue import JOB_DB, JobQueue, DONE
+
+WIDTH = 800
+HEIGHT = 400
+# left, top, right, bottom
+MARGINS = (80, 50, 160, 60)
+COLORS = ['#209fdf', '#99ca53', '#f6a625', '#6d5fd5', '#bf593e', '#3eb8b0', '#d45fa6', '#7f7f7f']
+
+
+def collectJobs(job_db=JOB_DB):
+    if not os.path.exists(job_db):
+        return []
+    queue = JobQueue(job_db)
+    jobs = [dict(job) for job in queue.jobs()]
+    queue.close()
+    return jobs
+
+
+def _niceTicks(hi, count=5):
+    if hi <= 0 or not math.isfinite(hi):
+        return [0, 1]
+    raw = hi / count
+    mag = 10 ** math.floor(math.log10(raw))
+    step = min([m * mag for m in (1, 2, 2.5, 5, 10) if m * mag >= raw])
+    return [i * step for i in range(int(math.ceil(hi / step)) + 1)]
+
+
+def _fmt(v):
+    return f'{v:.4g}'
+
+
+class _Svg:
+    """ Plot area with linear y axis starting from 0 """
+
+    def __init__(self, title, y_max, y_title):
+        self.__out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" '
+                      f'viewBox="0 0 {WIDTH} {HEIGHT}" font-family="Arial" font-size="12">',
+                      f'<rect width="{WIDTH}" height="{HEIGHT}" fill="white"/>',
+                      f'<text x="{WIDTH / 2}" y="24" text-anchor="middle" font-size="16" font-weight="bold">'
+                      f'{html.escape(title)}</text>']
+        self.left, self.top = MARGINS[0], MARGINS[1]
+        self.right, self.bottom = WIDTH - MARGINS[2], HEIGHT - MARGINS[3]
+        self.__ticks = _niceTicks(y_max)
+        self.__y_max = self.__ticks[-1]
+        for t in self.__ticks:
+            y = self.y(t)
+            self.add(f'<line x1="{self.left}" y1="{y:.1f}" x2="{self.right}" y2="{y:.1f}" stroke="#e0e0e0"/>')
+            self.text(self.left - 6, y + 4, _fmt(t), anchor='end')
+        self.add(f'<line x1="{self.left}" y1="{self.bottom}" x2="{self.right}" y2="{self.bottom}" stroke="black"/>')
+        self.add(f'<line x1="{self.left}" y1="{self.top}" x2="{self.left}" y2="{self.bottom}" stroke="black"/>')
+        self.add(f'<text transform="translate(18 {(self.top + self.bottom) / 2}) rotate(-90)" '
+                 f'text-anchor="middle" font-weight="bold">{html.escape(y_title)}</text>')
+
+    def y(self, v):
+        return self.bottom - (self.bottom - self.top) * v / self.__y_max
+
+    def add(self, element):
+        self.__out.append(element)
+
+    def text(self, x, y, s, anchor='middle', extra=''):
+        self.add(f'<text x="{x:.1f}" y="{y:.1f}" text-anchor="{anchor}" {extra}>{html.escape(s)}</text>')
+
+    def xTitle(self, s):
+        self.text((self.left + self.right) / 2, HEIGHT - 12, s, extra='font-weight="bold"')
+
+    def legend(self, names):
+        for i, name in enumerate(names):
+            y = self.top + i * 20
+            self.add(f'<rect x="{self.right + 15}" y="{y}" width="12" height="12" fill="{COLORS[i % len(COLORS)]}"/>')
+            self.text(self.right + 32, y + 11, name, anchor='start')
+
+    def toString(self):
+        return '\n'.join(self.__out + ['</svg>'])
+
+
+def barChartSvg(title, labels, values, errors=None, x_title='Language', y_title='Seconds'):
+    """ Bar chart, errors (half width of confidence interval) are drawn as whiskers """
+    errors = errors or [0] * len(values)
+    svg = _Svg(title, max([v + (e if math.isfinite(e) else 0) for v, e in zip(values, errors)] + [0]), y_title)
+    slot = (svg.right - svg.left) / max(len(labels), 1)
+    for i, (label, v, e) in enumerate(zip(labels, values, errors)):
+        x = svg.left + slot * i + slot * 0.2
+        w = slot * 0.6
+        svg.add(f'<rect x="{x:.1f}" y="{svg.y(v):.1f}" width="{w:.1f}" height="{svg.bottom - svg.y(v):.1f}" '
+                f'fill="{COLORS[0]}"><title>{html.escape(label)}: {v:.6f}</title></rect>')
+        if e and math.isfinite(e):
+            cx = x + w / 2
+            # seconds can't be negative
+            low = max(v - e, 0)
+            svg.add(f'<path d="M{cx:.1f} {svg.y(low):.1f} V{svg.y(v + e):.1f} M{cx - 6:.1f} {svg.y(v + e):.1f} '
+                    f'h12 M{cx - 6:.1f} {svg.y(low):.1f} h12" stroke="black"/>')
+        svg.text(x + w / 2, svg.y(v + (e if e and math.isfinite(e) else 0)) - 4, f'{v:.6f}')
+        svg.text(x + w / 2, svg.bottom + 16, label)
+    svg.xTitle(x_title)
+    return svg.toString()
+
+
+def boxPlotSvg(title, labels, samples_lst, x_title='Language', y_title='Seconds'):
+    """ Box plot (min, first quartile, median, third quartile, max) with every sample as a dot """
+    svg = _Svg(title, max([max(samples) for samples in samples_lst if samples] + [0]), y_title)
+    slot = (svg.right - svg.left) / max(len(labels), 1)
+    for i, (label, samples) in enumerate(zip(labels, samples_lst)):
+        if not samples:
+            continue
+        cx = svg.left + slot * (i + 0.5)
+        w = slot * 0.4
+        color = COLORS[i % len(COLORS)]
+        if len(samples) >= 2:
+            q1, median, q3 = statistics.quantiles(samples, n=4, method='inclusive')
+        else:
+            q1 = median = q3 = samples[0]
+        svg.add(f'<path d="M{cx:.1f} {svg.y(min(samples)):.1f} V{svg.y(q1):.1f} M{cx:.1f} {svg.y(q3):.1f} '
+                f'V{svg.y(max(samples)):.1f} M{cx - w / 4:.1f} {svg.y(min(samples)):.1f} h{w / 2:.1f} '
+                f'M{cx - w / 4:.1f} {svg.y(max(samples)):.1f} h{w / 2:.1f}" stroke="black"/>')
+        svg.add(f'<rect x="{cx - w / 2:.1f}" y="{svg.y(q3):.1f}" width="{w:.1f}" '
+                f'height="{max(svg.y(q1) - svg.y(q3), 1):.1f}" fill="{color}" fill-opacity="0.6" stroke="black"/>')
+        svg.add(f'<line x1="{cx - w / 2:.1f}" y1="{svg.y(median):.1f}" x2="{cx + w / 2:.1f}" '
+                f'y2="{svg.y(median):.1f}" stroke="black" stroke-width="2"/>')
+        for j, v in enumerate(samples):
+            # spread the dots a little so the same values don't hide each other
+            dx = (j % 7 - 3) * w / 14
+            svg.add(f'<circle cx="{cx + w / 2 + 10 + dx:.1f}" cy="{svg.y(v):.1f}" r="2" fill="{color}"/>')
+        svg.text(cx, svg.bottom + 16, label)
+        svg.text(cx, svg.bottom + 30, f'n={len(samples)}', extra='fill="gray"')
+    svg.xTitle(x_title)
+    return svg.toString()
+
+
+def lineChartSvg(title, series_dict, x_title, y_title='Seconds', log_x=False, x_format=_fmt):
+    """ Line chart of {name: [(x, y), ...]} """
+    points = [p for lst in series_dict.values() for p in lst]
+    svg = _Svg(title, max([y for _, y in points] + [0]), y_title)
+    xs = [x for x, _ in points] or [0, 1]
+    fx = (lambda v: math.log10(v)) if log_x else (lambda v: v)
+    lo, hi = fx(min(xs)), fx(max(xs))
+    if lo == hi:
+        lo, hi = lo - 1, hi + 1
+
+    def px(v):
+        return svg.left + 10 + (svg.right - svg.left - 20) * (fx(v) - lo) / (hi - lo)
+
+    for x in sorted(set(xs)) if len(set(xs)) <= 10 else [min(xs), max(xs)]:
+        svg.text(px(x), svg.bottom + 16, x_format(x))
+    for i, (name, lst) in enumerate(series_dict.items()):
+        lst = sorted(lst)
+        color = COLORS[i % len(COLORS)]
+        d = ' '.join(f'{"M" if j == 0 else "L"}{px(x):.1f} {svg.y(y):.1f}' for j, (x, y) in enumerate(lst))
+        svg.add(f'<path d="{d}" fill="none" stroke="{color}" stroke-width="2"/>')
+        for x, y in lst:
+            svg.add(f'<circle cx="{px(x):.1f}" cy="{svg.y(y):.1f}" r="3" fill="{color}">'
+                    f'<title>{html.escape(name)}: {y:.6f}</title></circle>')
+    svg.legend(list(series_dict.keys()))
+    svg.xTitle(x_title + (' (log scale)' if log_x else ''))
+    return svg.toString()
+
+
+def _date(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).strftime('%m-%d %H:%M')
+
+
+def buildCharts(data):
+    """ List of (title, svg, header of table, rows of table) for the data made by collectReportData() """
+    charts = []
+
+    results = data.get('results') or {}
+    if results:
+        lst = sorted([[k, *meanCi(v), len(v)] for k, v in results.items()], key=lambda item: item[1])
+        title = f"Result (times: {data.get('times', '')})"
+        charts.append((title, barChartSvg(title, [item[0] for item in lst], [item[1] for item in lst],
+                                          [item[2] for item in lst]),
+                       ['Language', 'Mean', '95% CI', 'Trials'],
+                       [[k, f'{v:.6f}', f'±{e:.6f}' if math.isfinite(e) else '-', str(cnt)] for k, v, e, cnt in lst]))
+        if any(len(v) >= 2 for v in results.values()):
+            title = 'Distribution of Trials'
+            charts.append((title, boxPlotSvg(title, list(results.keys()), list(results.values())),
+                           ['Language', 'Seconds'],
+                           [[k, ', '.join(f'{s:.6f}' for s in v)] for k, v in results.items()]))
+
+    ab = data.get('ab') or {}
+    if len(ab) == 2 and all(ab.values()):
+        (name_a, a), (name_b, b) = ab.items()
+        speedup, low, high = speedupCi(a, b)
+        u, p = mannWhitneyU(a, b)
+        title = f'A/B: {name_a} vs {name_b}'
+        charts.append((title, boxPlotSvg(title, [name_a, name_b], [a, b], x_title='Variant'),
+                       ['Speedup of B over A', '95% CI', 'Mann-Whitney U', 'p-value'],
+                       [[f'{speedup:.3f}x', f'{low:.3f}x - {high:.3f}x', f'{u:.1f}', f'{p:.4g}']]))
+
+    # {times: {language: [(finished_at, seconds)]}}
+    n_dict = {}
+    for job in data.get('jobs') or []:
+        if job['status'] == DONE:
+            n_dict.setdefault(int(job['n']), {}).setdefault(job['language'], []).append(
+                (job['finished_at'], job['seconds']))
+    if len(n_dict) >= 2:
+        langs = sorted(set(k for lang_dict in n_dict.values() for k in lang_dict.keys()))
+        series_dict = {k: [(n, statistics.mean(s for _, s in n_dict[n][k])) for n in sorted(n_dict) if k in n_dict[n]]
+                       for k in langs}
+        title = 'Sweep'
+        charts.append((title, lineChartSvg(title, series_dict, 'Times', log_x=True, x_format=lambda v: f'{v:,.0f}'),
+                       ['Language'] + [f'{n:,}' for n in sorted(n_dict)],
+                       [[k] + [f'{dict(series_dict[k])[n]:.6f}' if n in dict(series_dict[k]) else '-'
+                              for n in sorted(n_dict)] for k in langs]))
+    for n in sorted(n_dict):
+        lang_dict = n_dict[n]
+        title = f'Job Queue Distribution (times: {n:,})'
+        charts.append((title, boxPlotSvg(title, list(lang_dict.keys()), [[s for _, s in v] for v in lang_dict.values()]),
+                       ['Language', 'Mean', 'Jobs'],
+                       [[k, f'{statistics.mean(s for _, s in v):.6f}', str(len(v))] for k, v in lang_dict.items()]))
+        # results of several nights show the trend
+        if any(len(v) >= 2 for v in lang_dict.values()):
+            title = f'Trend (times: {n:,})'
+            charts.append((title, lineChartSvg(title, lang_dict, 'Finished at', x_format=_date),
+                           ['Language', 'First', 'Last'],
+                           [[k, _date(min(v)[0]), _date(max(v)[0])] for k, v in lang_dict.items()]))
+    return charts
+
+
+def collectReportData(results=None, ab=None, times='', job_db=JOB_DB, device=''):
+    return {
+        'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'device': device,
+        'times': times,
+        'results': results or {},
+        'ab': ab or {},
+        'jobs': collectJobs(job_db)
+    }
+
+
+def writeHtmlReport(path, data):
+    charts = buildCharts(data)
+    out = ['<!DOCTYPE html>', '<html><head><meta charset="utf-8">',
+           f'<title>Language Comparison Report {html.escape(data["generated_at"])}</title>',
+           '<style>body { font-family: Arial; margin: 20px; } table { border-collapse: collapse; margin-bottom: 30px; }'
+           ' td, th { border: 1px solid #ccc; padding: 4px 8px; text-align: center; }</style>',
+           '</head><body>',
+           f'<h1>Language Comparison Report</h1>',
+           f'<p>Generated at {html.escape(data["generated_at"])}</p>',
+           f'<pre>{html.escape(data.get("device", ""))}</pre>']
+    if not charts:
+        out.append('<p>No result</p>')
+    for title, svg, header, rows in charts:
+        out.append(f'<h2>{html.escape(title)}</h2>')
+        out.append(svg)
+        out.append('<table><tr>' + ''.join(f'<th>{html.escape(h)}</th>' for h in header) + '</tr>')
+        for row in rows:
+            out.append('<tr>' + ''.join(f'<td>{html.escape(c)}</td>' for c in row) + '</tr>')
+        out.append('</table>')
+    # raw data, it can be read with JSON.parse(document.getElementById('raw-data').textContent)
+    raw = json.dumps(data, indent=1).replace('</', '<\\/')
+    out.append(f'<script type="application/json" id="raw-data">{raw}</script>')
+    out.append('</body></html>')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(out))
+
+
+def _tableLines(header, rows, max_chars):
+    """ Lines of the table in monospace font, the widest column is wrapped so every line fits in max_chars """
+    widths = [max(len(row[j]) for row in [header] + rows) for j in range(len(header))]
+    # 2 spaces between columns
+    over = sum(widths) + 2 * (len(widths) - 1) - max_chars
+    if over > 0:
+        j = widths.index(max(widths))
+        widths[j] = max(widths[j] - over, 10)
+    lines = []
+    for row in [header] + rows:
+        cells = [textwrap.wrap(c, w) or [''] for c, w in zip(row, widths)]
+        for i in range(max(len(c) for c in cells)):
+            lines.append('  '.join((c[i] if i < len(c) else '').ljust(w) for c, w in zip(cells, widths)).rstrip())
+    return lines
+
+
+def writePdfReport(path, data):
+    # QPainter on QPdfWriter works in any thread (QGuiApplication is needed though)
+    from PySide6.QtCore import QByteArray, QRectF, QMarginsF
+    from PySide6.QtGui import QPdfWriter, QPainter, QFont, QPageLayout, QPageSize
+    from PySide6.QtSvg import QSvgRenderer
+
+    writer = QPdfWriter(path)
+    writer.setPageLayout(QPageLayout(QPageSize(QPageSize.A4), QPageLayout.Landscape, QMarginsF(10, 10, 10, 10)))
+    writer.setResolution(100)
+    writer.setTitle('Language Comparison Report')
+    p = QPainter()
+    p.begin(writer)
+    page = QRectF(0, 0, writer.width(), writer.height())
+
+    p.setFont(QFont('Arial', 20))
+    p.drawText(page, 0, f'Language Comparison Report\n\nGenerated at {data["generated_at"]}\n\n'
+                        f'{data.get("device", "")}')
+    for title, svg, header, rows in buildCharts(data):
+        writer.newPage()
+        renderer = QSvgRenderer(QByteArray(svg.encode('utf-8')))
+        # keep the aspect ratio of the chart
+        h = min(page.height() * 0.75, page.width() * HEIGHT / WIDTH)
+        renderer.render(p, QRectF(0, 0, h * WIDTH / HEIGHT, h))
+        # monospace font to line up the columns
+        p.setFont(QFont('Courier', 9))
+        fm = p.fontMetrics()
+        lines = _tableLines(header, rows, int(page.width() / fm.horizontalAdvance('0')))
+        # rows which don't fit under the chart go on to the next pages
+        top = h + 10
+        while lines:
+            cnt = max(int((page.height() - top) / fm.lineSpacing()), 1)
+            p.drawText(QRectF(0, top, page.width(), page.height() - top), 0, '\n'.join(lines[:cnt]))
+            lines = lines[cnt:]
+            if lines:
+                writer.newPage()
+                top = 0
+
+    # raw data
+    p.setFont(QFont('Courier', 8))
+    line_height = p.fontMetrics().lineSpacing()
+    lines_per_page = max(int(page.height() / line_height), 1)
+    lines = json.dumps(data, indent=1).splitlines()
+    for i in range(0, len(lines), lines_per_page):
+        writer.newPage()
+        p.drawText(page, 0, '\n'.join(lines[i:i + lines_per_page]))
+    p.end()
+
+
+def writeReport(path, data):
+    if path.lower().endswith('.pdf'):
+        writePdfReport(path, data)
+    else:
+        writeHtmlReport(path, data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Make report of the job queue (e.g. for nightly runs)')
+    parser.add_argument('-o', '--output', required=True, help='report file (.html or .pdf)')
+    parser.add_argument('--jobs', default=JOB_DB, help='job queue database')
+    args = parser.parse_args()
+
+    if args.output.lower().endswith('.pdf'):
+        # pdf needs fonts of QGuiApplication, but no display
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PySide6.QtGui import QGuiApplication
+        app = QGuiApplication([])  # noqa: F841 (it has to be alive while writing)
+    writeReport(args.output, collectReportData(job_db=args.jobs))
+    print(os.path.abspath(args.output))
+
+
+if __name__ == '__main__':
+    main()
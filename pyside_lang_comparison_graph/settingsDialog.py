@@ -1,7 +1,7 @@
 import shutil
 
 from PySide6.QtWidgets import QDialog, QHBoxLayout, QCheckBox, QVBoxLayout, QPushButton, QTableWidgetItem, \
-    QAbstractItemView, QGroupBox
+    QAbstractItemView, QGroupBox, QFormLayout, QSpinBox, QDoubleSpinBox
 
 import typing
 
@@ -140,6 +140,8 @@ class SettingsDialog(QDialog):
 
     def __initVal(self):
         self.__langs_test_available_dict = {}
+        self.__trials_dict = {'TargetRelCI': 2.0, 'TimeBudget': 600, 'MinTrials': 3, 'MaxTrials': 30}
+        self.__profile_enabled = 0
         self.__langs_app_dict = {'Python': 'python', 'R': 'r', 'Go': 'go', 'Rust': 'rustc', 'Julia': 'julia'}
 
     def __initSettings(self):
@@ -152,6 +154,17 @@ class SettingsDialog(QDialog):
             self.__langs_test_available_dict[k] = v
         self.__settingsStruct.endGroup()
 
+        # [Trials]
+        self.__settingsStruct.beginGroup('Trials')
+        for k, v in self.__trials_dict.items():
+            self.__trials_dict[k] = type(v)(self.__settingsStruct.value(k, v))
+        self.__settingsStruct.endGroup()
+
+        # [Profile]
+        self.__settingsStruct.beginGroup('Profile')
+        self.__profile_enabled = int(self.__settingsStruct.value('Enabled', 0))
+        self.__settingsStruct.endGroup()
+
     def __initUi(self):
         self.setWindowTitle('Settings')
         self.__langTableWidget = CheckBoxTableWidget()
@@ -194,8 +207,54 @@ class SettingsDialog(QDialog):
         langGrpBox.setTitle('Select Languages to Test')
         langGrpBox.setLayout(lay)
 
-        lay = QHBoxLayout()
+        self.__targetRelCiSpinBox = QDoubleSpinBox()
+        self.__targetRelCiSpinBox.setRange(0.1, 50.0)
+        self.__targetRelCiSpinBox.setSingleStep(0.5)
+        self.__targetRelCiSpinBox.setPrefix('±')
+        self.__targetRelCiSpinBox.setSuffix('%')
+        self.__targetRelCiSpinBox.setValue(self.__trials_dict['TargetRelCI'])
+
+        self.__timeBudgetSpinBox = QSpinBox()
+        self.__timeBudgetSpinBox.setRange(1, 86400)
+        self.__timeBudgetSpinBox.setSuffix(' seconds')
+        self.__timeBudgetSpinBox.setValue(self.__trials_dict['TimeBudget'])
+
+        self.__minTrialsSpinBox = QSpinBox()
+        self.__minTrialsSpinBox.setRange(2, 1000)
+        self.__minTrialsSpinBox.setValue(self.__trials_dict['MinTrials'])
+
+        self.__maxTrialsSpinBox = QSpinBox()
+        self.__maxTrialsSpinBox.setRange(2, 1000)
+        self.__maxTrialsSpinBox.setValue(self.__trials_dict['MaxTrials'])
+
+        # max trials can't be smaller than min trials
+        self.__minTrialsSpinBox.valueChanged.connect(self.__maxTrialsSpinBox.setMinimum)
+        self.__maxTrialsSpinBox.setMinimum(self.__minTrialsSpinBox.value())
+
+        lay = QFormLayout()
+        lay.addRow('Target 95% CI', self.__targetRelCiSpinBox)
+        lay.addRow('Time Budget', self.__timeBudgetSpinBox)
+        lay.addRow('Min Trials', self.__minTrialsSpinBox)
+        lay.addRow('Max Trials', self.__maxTrialsSpinBox)
+
+        trialsGrpBox = QGroupBox()
+        trialsGrpBox.setTitle('Trials (run each language until its result converges)')
+        trialsGrpBox.setLayout(lay)
+
+        self.__profileChkBox = QCheckBox('Save flamegraph of each language (perf, or sampler for Python)')
+        self.__profileChkBox.setChecked(bool(self.__profile_enabled))
+
+        lay = QVBoxLayout()
+        lay.addWidget(self.__profileChkBox)
+
+        profileGrpBox = QGroupBox()
+        profileGrpBox.setTitle('Profile')
+        profileGrpBox.setLayout(lay)
+
+        lay = QVBoxLayout()
         lay.addWidget(langGrpBox)
+        lay.addWidget(trialsGrpBox)
+        lay.addWidget(profileGrpBox)
 
         topWidget = QWidget()
         topWidget.setLayout(lay)
@@ -247,4 +306,15 @@ class SettingsDialog(QDialog):
         self.__settingsStruct.beginGroup('Languages')
         for k, v in dict.items():
             self.__settingsStruct.setValue(k, v)
+        self.__settingsStruct.endGroup()
+
+        self.__settingsStruct.beginGroup('Trials')
+        self.__settingsStruct.setValue('TargetRelCI', self.__targetRelCiSpinBox.value())
+        self.__settingsStruct.setValue('TimeBudget', self.__timeBudgetSpinBox.value())
+        self.__settingsStruct.setValue('MinTrials', self.__minTrialsSpinBox.value())
+        self.__settingsStruct.setValue('MaxTrials', self.__maxTrialsSpinBox.value())
+        self.__settingsStruct.endGroup()
+
+        self.__settingsStruct.beginGroup('Profile')
+        self.__settingsStruct.setValue('Enabled', int(self.__profileChkBox.isChecked()))
         self.__settingsStruct.endGroup()
\ No newline at end of file